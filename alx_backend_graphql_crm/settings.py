@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,6 +51,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'crm.middleware.DataLoaderMiddleware',  # Per-request DataLoaders for GraphQL resolvers
 ]
 
 ROOT_URLCONF = 'alx_backend_graphql_crm.urls'
@@ -84,6 +86,30 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The cached allCustomers/allProducts lists (crm/caching.py) are invalidated
+# through the cache itself, so every process must share one backend: set
+# CACHE_REDIS_URL (e.g. redis://localhost:6379/1) when running more than one
+# worker. The local-memory fallback is only correct for a single process.
+
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,56 @@
+import hashlib
+
+from django.core.cache import cache
+from graphene_django.filter import DjangoFilterConnectionField
+
+CACHE_TIMEOUT = 60  # Seconds a cached list stays fresh
+CACHE_MAX_ROWS = 1000  # Larger result sets are not worth holding in the cache
+TOO_LARGE = 'too-large'  # Cached in place of rows so oversized results skip the probe next time
+
+
+def _generation_key(model):
+    return f'crm:{model._meta.model_name}:generation'
+
+
+def bump_cache_generation(model):
+    """Invalidate every cached list of model by moving it to a new generation."""
+    try:
+        cache.incr(_generation_key(model))
+    except ValueError:
+        cache.set(_generation_key(model), 1, None)
+
+
+def list_cache_key(model, filter_args):
+    """Build a stable cache key for a filtered list of model."""
+    generation = cache.get_or_set(_generation_key(model), 1, None)
+    digest = hashlib.md5(repr(sorted(filter_args.items())).encode(), usedforsecurity=False).hexdigest()
+    return f'crm:{model._meta.model_name}:v{generation}:{digest}'
+
+
+class CachedDjangoFilterConnectionField(DjangoFilterConnectionField):
+    """
+    DjangoFilterConnectionField that caches the filtered rows per filter arguments.
+
+    Pagination arguments are left out of the key: the cached rows are sliced
+    per request, so every page of the same filter shares one entry. Querysets
+    with prefetches are never cached, since the cache would freeze the related rows.
+    Results over CACHE_MAX_ROWS are remembered as TOO_LARGE and go straight to
+    the database until the entry expires.
+    """
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, filtering_args, filterset_class):
+        qs = super().resolve_queryset(connection, iterable, info, args, filtering_args, filterset_class)
+        if qs._prefetch_related_lookups:
+            return qs
+
+        key = list_cache_key(qs.model, {k: v for k, v in args.items() if k in filtering_args})
+        rows = cache.get(key)
+        if rows is None:
+            rows = list(qs[:CACHE_MAX_ROWS + 1])
+            if len(rows) > CACHE_MAX_ROWS:
+                rows = TOO_LARGE
+            cache.set(key, rows, CACHE_TIMEOUT)
+        if rows == TOO_LARGE:
+            return qs
+        return rows
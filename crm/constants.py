@@ -0,0 +1,3 @@
+# Rows per INSERT/UPDATE statement for bulk writes; keeps each statement's parameter buffer bounded
+# (PostgreSQL rejects statements past its 1 GB MaxAllocSize)
+BULK_BATCH_SIZE = 1000
@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+from .models import Customer, Product
+
+
+class DataLoader:
+    """
+    Request-scoped batching loader.
+
+    GraphQLView executes resolvers synchronously, so instead of deferring
+    loads until the end of a tick, keys are queued up front with enqueue()
+    (e.g. for every node on a connection page) and fetched in one batch on
+    the first cache miss.
+    """
+
+    def __init__(self):
+        self._cache = {}
+        self._queue = []
+
+    def batch_load_fn(self, keys):
+        """Return one value per key, in the same order as keys."""
+        raise NotImplementedError
+
+    def enqueue(self, keys):
+        self._queue.extend(key for key in keys if key not in self._cache)
+
+    def load(self, key):
+        if key not in self._cache:
+            keys = list(dict.fromkeys([key, *self._queue]))
+            self._queue = []
+            self._cache.update(zip(keys, self.batch_load_fn(keys)))
+        return self._cache[key]
+
+    def load_many(self, keys):
+        self.enqueue(keys)
+        return [self.load(key) for key in keys]
+
+
+class CustomerByIdLoader(DataLoader):
+    """Load customers by primary key."""
+
+    def batch_load_fn(self, customer_ids):
+        customers = Customer.objects.in_bulk(customer_ids)
+        return [customers.get(customer_id) for customer_id in customer_ids]
+
+
+class ProductByIdLoader(DataLoader):
+    """Load products by primary key."""
+
+    def batch_load_fn(self, product_ids):
+        products = Product.objects.in_bulk(product_ids)
+        return [products.get(product_id) for product_id in product_ids]
+
+
+def build_loaders():
+    """Create a fresh set of loaders for a single request."""
+    return SimpleNamespace(
+        customer_by_id=CustomerByIdLoader(),
+        product_by_id=ProductByIdLoader(),
+    )
+
+
+def get_loaders(context):
+    """
+    Return the loaders attached to context, attaching them if missing.
+
+    Without a context (e.g. schema.execute() with no context_value) there is
+    nowhere to keep them, so a fresh, unshared set is returned.
+    """
+    if context is None:
+        return build_loaders()
+    loaders = getattr(context, 'loaders', None)
+    if loaders is None:
+        loaders = context.loaders = build_loaders()
+    return loaders
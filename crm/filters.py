@@ -1,18 +1,38 @@
 import django_filters
 from .models import Customer, Product, Order
-from django.db.models import Q
 
-class CustomerFilter(django_filters.FilterSet):
+class CachedFormFilterSet(django_filters.FilterSet):
+    """
+    FilterSet that builds its validation form class once per class.
+
+    django-filter creates a new Form class with type() on every request; the
+    declared filters never change between requests, so the class is built on
+    first use and reused. Each Form instance still deep-copies its fields.
+    """
+
+    def get_form_class(self):
+        cls = type(self)
+        if '_form_class' not in cls.__dict__:
+            cls._form_class = super().get_form_class()
+        return cls._form_class
+
+class CustomerFilter(CachedFormFilterSet):
     name = django_filters.CharFilter(lookup_expr='icontains')
     email = django_filters.CharFilter(lookup_expr='icontains')
     created_at__gte = django_filters.DateFilter(field_name='created_at', lookup_expr='gte')
     created_at__lte = django_filters.DateFilter(field_name='created_at', lookup_expr='lte')
     phone_startswith = django_filters.CharFilter(method='filter_phone_startswith')
 
-    # Filter customers whose phone starts with a specific value or is null
+    # Filter customers whose phone starts with a specific value or is null.
+    # The two branches are disjoint, so UNION ALL lets each one use its own index
+    # (an OR across them forces a sequential scan). Matching on pk keeps the
+    # result a plain queryset that later filters and ordering can still apply to.
     def filter_phone_startswith(self, queryset, name, value):
         if value:
-            return queryset.filter(Q(phone__startswith=value) | Q(phone__isnull=True))
+            matches = Customer.objects.filter(phone__startswith=value).values('pk').union(
+                Customer.objects.filter(phone__isnull=True).values('pk'), all=True
+            )
+            return queryset.filter(pk__in=matches)
         return queryset
 
     class Meta:
@@ -20,7 +40,7 @@ class CustomerFilter(django_filters.FilterSet):
         fields = ['name', 'email', 'created_at__gte', 'created_at__lte', 'phone_startswith']
 
 
-class ProductFilter(django_filters.FilterSet):
+class ProductFilter(CachedFormFilterSet):
     name = django_filters.CharFilter(lookup_expr='icontains')
     price__gte = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
     price__lte = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
@@ -38,7 +58,7 @@ class ProductFilter(django_filters.FilterSet):
         model = Product
         fields = ['name', 'price__gte', 'price__lte', 'stock__gte', 'stock__lte', 'low_stock']
 
-class OrderFilter(django_filters.FilterSet):
+class OrderFilter(CachedFormFilterSet):
     total_amount__gte = django_filters.NumberFilter(field_name='total_amount', lookup_expr='gte')
     total_amount__lte = django_filters.NumberFilter(field_name='total_amount', lookup_expr='lte')
     order_date__gte = django_filters.DateFilter(field_name='order_date', lookup_expr='gte')
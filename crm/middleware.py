@@ -0,0 +1,12 @@
+from .dataloaders import build_loaders
+
+
+class DataLoaderMiddleware:
+    """Attach a fresh set of DataLoaders to every request (info.context.loaders)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.loaders = build_loaders()
+        return self.get_response(request)
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.21 on 2026-10-15 06:18
+
+from django.db import migrations, models
+
+# Trigram indexes on the columns the icontains filters search. On PostgreSQL,
+# icontains compiles to UPPER(col::text) LIKE UPPER(%s), so index that expression.
+TRIGRAM_INDEXES = [
+    ('crm_customer_name_trgm', 'crm_customer', 'name'),
+    ('crm_customer_email_trgm', 'crm_customer', 'email'),
+    ('crm_product_name_trgm', 'crm_product', 'name'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0002_customer_created_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['created_at'], name='crm_customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['order_date'], name='crm_order_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['total_amount'], name='crm_order_total_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price'], name='crm_product_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['stock'], name='crm_product_stock_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.21 on 2026-10-15 06:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0003_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customer',
+            name='phone',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(condition=models.Q(('phone__isnull', True)), fields=['phone'], name='crm_customer_phone_null_idx'),
+        ),
+    ]
@@ -4,9 +4,18 @@ from django.db import models
 class Customer(models.Model):
     name = models.CharField(max_length=255)
     email = models.EmailField(unique=True)
-    phone = models.CharField(max_length=20, blank=True, null=True)
+    # db_index also gives PostgreSQL a varchar_pattern_ops index, so phone LIKE 'x%' can use it
+    phone = models.CharField(max_length=20, blank=True, null=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # B-tree index for the created_at range filters in CustomerFilter,
+        # and a partial index for the phone IS NULL branch of phone_startswith
+        indexes = [
+            models.Index(fields=['created_at'], name='crm_customer_created_idx'),
+            models.Index(fields=['phone'], condition=models.Q(phone__isnull=True), name='crm_customer_phone_null_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -15,6 +24,13 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        # B-tree indexes for the price/stock range filters in ProductFilter
+        indexes = [
+            models.Index(fields=['price'], name='crm_product_price_idx'),
+            models.Index(fields=['stock'], name='crm_product_stock_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -24,5 +40,12 @@ class Order(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     order_date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # B-tree indexes for the order_date/total_amount range filters in OrderFilter
+        indexes = [
+            models.Index(fields=['order_date'], name='crm_order_date_idx'),
+            models.Index(fields=['total_amount'], name='crm_order_total_idx'),
+        ]
+
     def __str__(self):
         return f"Order {self.id} by {self.customer.name}"
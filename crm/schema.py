@@ -4,36 +4,112 @@ from .models import Customer, Product, Order
 from decimal import Decimal
 from graphql import GraphQLError
 from django.utils import timezone
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Sum
+from graphene_django import DjangoConnectionField
 from graphene_django.filter import DjangoFilterConnectionField
 from .filters import CustomerFilter, ProductFilter, OrderFilter
-from .t
+from .dataloaders import get_loaders
+from .caching import CachedDjangoFilterConnectionField, bump_cache_generation
+from .constants import BULK_BATCH_SIZE
+from graphql import GraphQLID, value_from_ast
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode
+from graphql_relay import from_global_id
 import re
 
+PHONE_PATTERN = re.compile(r'^\+?[1-9]\d{1,14}$')  # Example pattern for international phone numbers
+
+# Upper bound on distinct products in one order; keeps the IN clause and link inserts small
+MAX_ORDER_PRODUCTS = 100
+
+# Loader (on info.context.loaders) used for relay node lookups of each type
+NODE_LOADERS = {
+    'CustomerType': 'customer_by_id',
+    'ProductType': 'product_by_id',
+}
+
+def _queue_root_nodes(info, loaders):
+    # Queue the IDs of every root node(id:) field in the operation, so distinct IDs
+    # of the same type load in one query instead of one per field
+    if getattr(loaders, 'root_nodes_queued', False):
+        return
+    loaders.root_nodes_queued = True
+    for selection in info.operation.selection_set.selections:
+        if not isinstance(selection, FieldNode) or selection.name.value != 'node':
+            continue
+        for argument in selection.arguments:
+            if argument.name.value != 'id':
+                continue
+            try:
+                type_name, pk = from_global_id(value_from_ast(argument.value, GraphQLID, info.variable_values))
+                pk = int(pk)
+            except (TypeError, ValueError, UnicodeDecodeError):
+                continue
+            if type_name in NODE_LOADERS:
+                getattr(loaders, NODE_LOADERS[type_name]).enqueue([pk])
+
+class LoaderNodeMixin:
+    """Resolve relay node(id:) lookups through the request's DataLoaders."""
+
+    @classmethod
+    def get_node(cls, info, id):
+        # A type with its own get_queryset (e.g. permission filtering) keeps the default lookup
+        if cls.get_queryset.__func__ is not DjangoObjectType.get_queryset.__func__:
+            return super().get_node(info, id)
+        loaders = get_loaders(info.context)
+        _queue_root_nodes(info, loaders)
+        try:
+            return getattr(loaders, NODE_LOADERS[cls._meta.name]).load(int(id))
+        except (TypeError, ValueError):
+            return None
+
 # Define GraphQL types for your models
-class CustomerType(DjangoObjectType):
+class CustomerType(LoaderNodeMixin, DjangoObjectType):
     class Meta:
         model = Customer
         interfaces = (graphene.relay.Node,)
         fields = "__all__"
 
-class ProductType(DjangoObjectType):
+class ProductType(LoaderNodeMixin, DjangoObjectType):
     class Meta:
         model = Product
         interfaces = (graphene.relay.Node,)
         fields = "__all__"
 
+class OrderConnection(graphene.relay.Connection):
+    class Meta:
+        abstract = True
+
+    def resolve_edges(self, info):
+        # Queue the customers the page will ask for so they load in one batch;
+        # skip them when not selected or already joined by select_related
+        if 'customer' in edge_node_fields(info, info.field_nodes):
+            customer_ids = [
+                edge.node.customer_id for edge in self.edges
+                if not Order.customer.is_cached(edge.node)
+            ]
+            if customer_ids:
+                get_loaders(info.context).customer_by_id.enqueue(customer_ids)
+        return self.edges
+
 class OrderType(DjangoObjectType):
     total_amount = graphene.Float()  # Custom field to calculate total price
-    products = graphene.List(ProductType)  # Custom field to resolve products in the order
+    products = DjangoConnectionField(ProductType)  # The `product` M2M under its documented name
 
     class Meta:
         model = Order
         interfaces = (graphene.relay.Node,)
-        fields = "__all__"
+        exclude = ("product",)
+        connection_class = OrderConnection
 
-    def resolve_products(self, info):
-        # Resolve the products field to return a list of products
-        return self.products.all()
+    def resolve_customer(self, info):
+        if Order.customer.is_cached(self):  # Already joined by select_related
+            return self.customer
+        return get_loaders(info.context).customer_by_id.load(self.customer_id)
+
+    def resolve_products(self, info, **kwargs):
+        # .all() reuses the rows when the list resolver prefetched them
+        return self.product.all()
 
     def resolve_total_amount(self, info):
         # Resolve the total_amount field to return the total amount of the order
@@ -58,8 +134,12 @@ class CreateOrderInput(graphene.InputObjectType):
 #  Helper validation function
 def is_valid_phone(phone):
     # Check if the phone number is valid (e.g., matches a specific pattern)
-    pattern = re.compile(r'^\+?[1-9]\d{1,14}$')  # Example pattern for international phone numbers
-    return bool(pattern.match(phone))
+    return PHONE_PATTERN.match(phone) is not None
+
+def valid_phones(items):
+    # Validate every item's phone in one pass up front; items without a phone are valid
+    match = PHONE_PATTERN.match
+    return [not item.phone or match(item.phone) is not None for item in items]
 
 # Mutations for creating records
 class CreateCustomer(graphene.Mutation):
@@ -79,9 +159,14 @@ class CreateCustomer(graphene.Mutation):
             email=input.email,
             phone=input.phone
         )
-        if Customer.objects.filter(email=input.email).exists():
+        # Check email and phone uniqueness in a single query; an email clash
+        # takes priority over a phone clash, whichever row comes back first
+        clashing_emails = list(Customer.objects.filter(
+            Q(email=input.email) | Q(phone=input.phone)
+        ).values_list('email', flat=True))
+        if input.email in clashing_emails:
             raise GraphQLError("A customer with this email already exists.")
-        if Customer.objects.filter(phone=input.phone).exists():
+        if clashing_emails:
             raise GraphQLError("A customer with this phone number already exists.")
 
         customer.save()
@@ -95,10 +180,15 @@ class BulkCreateCustomers(graphene.Mutation):
     errors = graphene.List(graphene.String)
 
     def mutate(self, info, input):
-        created_customers = []
+        customers_to_create = []
         errors = []
 
-        for item in input:
+        # Fetch every clashing email in one query instead of one per item
+        emails = [item.email for item in input if item.email]
+        existing_emails = set(Customer.objects.filter(email__in=emails).values_list('email', flat=True))
+        phone_ok = valid_phones(input)
+
+        for item, phone_valid in zip(input, phone_ok):
             try:
                 name = item.name
                 email = item.email
@@ -106,22 +196,84 @@ class BulkCreateCustomers(graphene.Mutation):
 
                 if not name or not email:
                     raise GraphQLError("Name and email are required fields.")
-                if phone and not is_valid_phone(phone):
+                if not phone_valid:
                     raise GraphQLError(f"Invalid phone number format. {phone}")
-                if Customer.objects.filter(email=email).exists():
+                if email in existing_emails:
                     raise GraphQLError(f"A customer with email {email} already exists.")
 
-                customer = Customer(
+                existing_emails.add(email)  # Reject duplicates within the same batch too
+                customers_to_create.append(Customer(
                     name=name,
                     email=email,
                     phone=phone
-                )
+                ))
+            except GraphQLError as e:
+                errors.append(str(e))
+
+        # bulk_create sets primary keys on PostgreSQL and SQLite, so no reload is needed
+        try:
+            Customer.objects.bulk_create(customers_to_create, batch_size=BULK_BATCH_SIZE)
+        except IntegrityError:
+            raise GraphQLError("A customer with one of these emails was created concurrently. Please retry.")
+        bump_cache_generation(Customer)  # bulk_create sends no post_save signals
+
+        return BulkCreateCustomers(customers=customers_to_create, errors=errors)
+
+class BulkUpsertCustomers(graphene.Mutation):
+    class Arguments:
+        input = graphene.List(CreateCustomerInput, required=True)
+
+    customers = graphene.List(CustomerType)
+    errors = graphene.List(graphene.String)
+    created_count = graphene.Int()
+    updated_count = graphene.Int()
+
+    def mutate(self, info, input):
+        errors = []
+        phone_ok = valid_phones(input)
+
+        # One SELECT for every customer already on file; the rest are new
+        emails = [item.email for item in input if item.email]
+        existing = Customer.objects.in_bulk(emails, field_name='email')
+        to_update = {}
+        to_create = {}
 
-                customer.save()
-                created_customers.append(customer)
+        for item, phone_valid in zip(input, phone_ok):
+            try:
+                name = item.name
+                email = item.email
+                phone = item.phone
+
+                if not name or not email:
+                    raise GraphQLError("Name and email are required fields.")
+                if not phone_valid:
+                    raise GraphQLError(f"Invalid phone number format. {phone}")
+
+                # Later items for the same email overwrite earlier ones
+                if email in existing:
+                    customer = to_update.setdefault(email, existing[email])
+                else:
+                    customer = to_create.setdefault(email, Customer(email=email))
+                customer.name = name
+                if phone is not None:
+                    customer.phone = phone
             except GraphQLError as e:
                 errors.append(str(e))
-        return BulkCreateCustomers(customers=created_customers, errors=errors)
+
+        try:
+            with transaction.atomic():
+                Customer.objects.bulk_update(to_update.values(), ['name', 'phone'], batch_size=BULK_BATCH_SIZE)
+                Customer.objects.bulk_create(to_create.values(), batch_size=BULK_BATCH_SIZE)
+        except IntegrityError:
+            raise GraphQLError("A customer with one of these emails was created concurrently. Please retry.")
+        bump_cache_generation(Customer)  # bulk writes send no post_save signals
+
+        return BulkUpsertCustomers(
+            customers=[*to_update.values(), *to_create.values()],
+            errors=errors,
+            created_count=len(to_create),
+            updated_count=len(to_update)
+        )
 
 class CreateProduct(graphene.Mutation):
     class Arguments:
@@ -163,31 +315,91 @@ class CreateOrder(graphene.Mutation):
         
         if not product_ids:
             raise GraphQLError("At least one product ID must be provided.")
+
+        # Normalize the product IDs up front: drop duplicates (keeping order) and bound the list size
+        try:
+            product_ids = list(dict.fromkeys(map(int, product_ids)))
+        except (TypeError, ValueError):
+            raise GraphQLError("Some product IDs are invalid or do not exist.")
+        if len(product_ids) > MAX_ORDER_PRODUCTS:
+            raise GraphQLError(f"An order cannot contain more than {MAX_ORDER_PRODUCTS} products.")
+
         try:
             customer = Customer.objects.get(id=customer_id)
         except Customer.DoesNotExist:
             raise GraphQLError("Invalid customer ID.")
 
-        products = Product.objects.filter(id__in=product_ids)
-        if not products.exists():
+        # Count the matching products and total their prices in the database, in one query
+        totals = Product.objects.filter(id__in=product_ids).aggregate(count=Count('id'), total=Sum('price'))
+        if not totals['count']:
             raise GraphQLError("No products found with the provided IDs.")
 
-        # Ensure that at least one valid product is included in the order
-        if len(products) != len(product_ids):
+        # Ensure that every requested product exists
+        if totals['count'] != len(product_ids):
             raise GraphQLError("Some product IDs are invalid or do not exist.")
 
-        total_amount = sum([product.price for product in products])
+        total_amount = totals['total'] or Decimal(0)
 
         order = Order(
             customer=customer,
             total_amount=total_amount,
             order_date=order_date or timezone.now()
         )
-        order.save()
-        order.product.set(products)  # Set the many-to-many relationship
+        # Save the order and its product links in one transaction; the order is new,
+        # so the links can be inserted directly instead of diffing them with set()
+        Through = Order.product.through
+        with transaction.atomic():
+            order.save()
+            Through.objects.bulk_create(
+                [Through(order_id=order.id, product_id=product_id) for product_id in product_ids],
+                batch_size=BULK_BATCH_SIZE
+            )
 
         return CreateOrder(order=order)
 
+#  Helpers to find which node fields a connection query asks for
+def _selected_field_nodes(info, selection_sets):
+    """Yield the field nodes of the given selection sets, expanding fragments."""
+    for selection_set in selection_sets:
+        for selection in selection_set.selections if selection_set else ():
+            if isinstance(selection, FieldNode):
+                yield selection
+            elif isinstance(selection, InlineFragmentNode):
+                yield from _selected_field_nodes(info, [selection.selection_set])
+            elif isinstance(selection, FragmentSpreadNode):
+                yield from _selected_field_nodes(info, [info.fragments[selection.name.value].selection_set])
+
+def _subfield_nodes(info, field_nodes, name):
+    """Return the `name` field nodes selected under any of field_nodes."""
+    return [
+        selection
+        for selection in _selected_field_nodes(info, [field_node.selection_set for field_node in field_nodes])
+        if selection.name.value == name
+    ]
+
+def edge_node_fields(info, edges_nodes):
+    """Return the field names selected under `node { ... }` of the given `edges` field nodes."""
+    nodes = _subfield_nodes(info, edges_nodes, 'node')
+    return {selection.name.value for selection in _selected_field_nodes(info, [node.selection_set for node in nodes])}
+
+def requested_node_fields(info):
+    """Return the field names selected under `edges { node { ... } }` of the current connection."""
+    return edge_node_fields(info, _subfield_nodes(info, info.field_nodes, 'edges'))
+
+def requested_node_subfields(info, name):
+    """Return the `name` field nodes selected under `edges { node { ... } }` of the current connection."""
+    nodes = _subfield_nodes(info, _subfield_nodes(info, info.field_nodes, 'edges'), 'node')
+    return _subfield_nodes(info, nodes, name)
+
+def order_set_prefetches(info):
+    """Return the prefetch lookups for an `orderSet` selected on the current connection's nodes."""
+    order_sets = requested_node_subfields(info, 'orderSet')
+    if not order_sets:
+        return []
+    if 'products' in edge_node_fields(info, _subfield_nodes(info, order_sets, 'edges')):
+        return ['order_set__product']
+    return ['order_set']
+
 class Query(graphene.ObjectType):
     """
     The root Query class for the GraphQL API, exposing fields to fetch customers, products, and orders.
@@ -195,22 +407,32 @@ class Query(graphene.ObjectType):
         - all_customers: List of all customers.
         - all_products: List of all products.
         - all_orders: List of all orders.
+        - node: Fetch any customer, product, or order by its global ID.
     """
-    all_customers = DjangoFilterConnectionField(CustomerType, filterset_class=CustomerFilter)
-    all_products = DjangoFilterConnectionField(ProductType, filterset_class=ProductFilter)
+    node = graphene.relay.Node.Field()
+    all_customers = CachedDjangoFilterConnectionField(CustomerType, filterset_class=CustomerFilter)
+    all_products = CachedDjangoFilterConnectionField(ProductType, filterset_class=ProductFilter)
     all_orders = DjangoFilterConnectionField(OrderType, filterset_class=OrderFilter)
 
-    def resolve_all_customers(self, info):
-        return Customer.objects.all()
+    # Eager-load only the relations the query selects, so a page costs a fixed number of queries
+    def resolve_all_customers(self, info, **kwargs):
+        return Customer.objects.prefetch_related(*order_set_prefetches(info))
 
-    def resolve_all_products(self, info):
-        return Product.objects.all()
+    def resolve_all_products(self, info, **kwargs):
+        return Product.objects.prefetch_related(*order_set_prefetches(info))
 
-    def resolve_all_orders(self, info):
-        return Order.objects.all()
+    def resolve_all_orders(self, info, **kwargs):
+        queryset = Order.objects.all()
+        fields = requested_node_fields(info)
+        if 'customer' in fields:
+            queryset = queryset.select_related('customer')
+        if 'products' in fields:
+            queryset = queryset.prefetch_related('product')
+        return queryset
 
 class Mutation(graphene.ObjectType):
     create_customer = CreateCustomer.Field()
     bulk_create_customers = BulkCreateCustomers.Field()
+    bulk_upsert_customers = BulkUpsertCustomers.Field()
     create_product = CreateProduct.Field()
     create_order = CreateOrder.Field()
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_cache_generation
+from .models import Customer, Product
+
+
+# Drop cached customer/product lists whenever a row changes
+@receiver([post_save, post_delete], sender=Customer)
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_list_cache(sender, **kwargs):
+    bump_cache_generation(sender)
@@ -1,3 +1,409 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+import django_filters
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import RequestFactory, TestCase
+from graphql_relay import to_global_id
+
+import seed_db
+from alx_backend_graphql_crm.schema import schema
+from .caching import list_cache_key
+from .filters import ProductFilter
+from .models import Customer, Order, Product
+from .schema import MAX_ORDER_PRODUCTS
+
+
+class GraphQLTestCase(TestCase):
+    """Base class that runs operations against the schema with a fresh request context."""
+
+    def setUp(self):
+        cache.clear()
+
+    def execute(self, query, variables=None):
+        result = schema.execute(
+            query,
+            variable_values=variables,
+            context_value=RequestFactory().post('/graphql/'),
+        )
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def execute_error(self, query, variables=None):
+        result = schema.execute(
+            query,
+            variable_values=variables,
+            context_value=RequestFactory().post('/graphql/'),
+        )
+        self.assertTrue(result.errors)
+        return str(result.errors[0])
+
+
+class BulkUpsertCustomersTests(GraphQLTestCase):
+    mutation = '''mutation($input: [CreateCustomerInput]!) {
+        bulkUpsertCustomers(input: $input) { customers { name email phone } errors createdCount updatedCount }
+    }'''
+
+    def test_bulk_upsert_customers(self):
+        Customer.objects.create(name='Old', email='old@example.com', phone='+15550001')
+        data = self.execute(self.mutation, {'input': [
+            {'name': 'Renamed', 'email': 'old@example.com'},
+            {'name': 'First', 'email': 'new@example.com', 'phone': '+15550002'},
+            {'name': 'Last', 'email': 'new@example.com'},
+            {'name': 'Bad', 'email': 'bad@example.com', 'phone': 'abc'},
+        ]})['bulkUpsertCustomers']
+
+        self.assertEqual(data['createdCount'], 1)
+        self.assertEqual(data['updatedCount'], 1)
+        self.assertEqual(data['errors'], ['Invalid phone number format. abc'])
+
+        # Missing phone keeps the stored one; the last item for an email wins
+        old = Customer.objects.get(email='old@example.com')
+        self.assertEqual((old.name, old.phone), ('Renamed', '+15550001'))
+        new = Customer.objects.get(email='new@example.com')
+        self.assertEqual((new.name, new.phone), ('Last', '+15550002'))
+        self.assertEqual(Customer.objects.count(), 2)
+
+    def test_bulk_upsert_reports_concurrent_insert(self):
+        Customer.objects.create(name='Old', email='old@example.com')
+        with mock.patch.object(Customer.objects, 'bulk_create', side_effect=IntegrityError):
+            error = self.execute_error(self.mutation, {'input': [
+                {'name': 'Renamed', 'email': 'old@example.com'},
+                {'name': 'New', 'email': 'new@example.com'},
+            ]})
+        self.assertIn('Please retry', error)
+        # The update is rolled back with the failed insert
+        self.assertEqual(Customer.objects.get(email='old@example.com').name, 'Old')
+
+
+class OrderCustomerLoaderTests(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        customers = [Customer.objects.create(name=f'Customer {i}', email=f'c{i}@example.com') for i in range(3)]
+        products = [Product.objects.create(name=f'Product {i}', price=i + 1) for i in range(4)]
+        for i in range(6):
+            order = Order.objects.create(customer=customers[i % 3], total_amount=1)
+            order.product.set(products[i % 2:i % 2 + 3])
+
+    def test_nested_order_customers_load_in_batches(self):
+        # count + products + prefetched orders + one batch of customers
+        with self.assertNumQueries(4):
+            data = self.execute('''{
+                allProducts(first: 1) { edges { node { orderSet { edges { node { customer { name } } } } } } }
+            }''')
+        names = {edge['node']['customer']['name'] for edge in data['allProducts']['edges'][0]['node']['orderSet']['edges']}
+        self.assertEqual(names, {'Customer 0', 'Customer 1', 'Customer 2'})
+
+    def test_order_page_without_context(self):
+        result = schema.execute('{ allOrders { edges { node { id customer { name } } } } }')
+        self.assertIsNone(result.errors)
+        self.assertEqual(len(result.data['allOrders']['edges']), 6)
+
+    def test_graphql_endpoint(self):
+        response = self.client.post(
+            '/graphql/',
+            json.dumps({'query': '{ allOrders(first: 2) { edges { node { customer { name } } } } }'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']['allOrders']['edges']), 2)
+
+
+class OrderListPrefetchTests(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        customers = [Customer.objects.create(name=f'Customer {i}', email=f'c{i}@example.com') for i in range(3)]
+        products = [Product.objects.create(name=f'Product {i}', price=i + 1) for i in range(4)]
+        for i in range(6):
+            order = Order.objects.create(customer=customers[i % 3], total_amount=1)
+            order.product.set(products[i % 2:i % 2 + 3])
+
+    def test_expanded_order_page_uses_fixed_number_of_queries(self):
+        # count + orders joined with customers + prefetched products
+        with self.assertNumQueries(3):
+            data = self.execute('''{
+                allOrders { edges { node { id customer { name } products { edges { node { name } } } } } }
+            }''')
+        edges = data['allOrders']['edges']
+        self.assertEqual(len(edges), 6)
+        self.assertEqual(len(edges[0]['node']['products']['edges']), 3)
+
+    def test_relations_selected_through_fragments_are_eager_loaded(self):
+        with self.assertNumQueries(3):
+            data = self.execute('''
+                { allOrders { ...OrderPage } }
+                fragment OrderPage on OrderTypeConnection {
+                    edges { ... on OrderTypeEdge { node { ...OrderFields } } }
+                }
+                fragment OrderFields on OrderType { customer { name } products { edges { node { name } } } }
+            ''')
+        self.assertEqual(len(data['allOrders']['edges']), 6)
+
+
+class BulkCreateCustomersTests(GraphQLTestCase):
+    mutation = '''mutation($input: [CreateCustomerInput]!) {
+        bulkCreateCustomers(input: $input) { customers { name email } errors }
+    }'''
+
+    def test_bulk_create_customers(self):
+        Customer.objects.create(name='Existing', email='existing@example.com')
+        data = self.execute(self.mutation, {'input': [
+            {'name': 'New', 'email': 'new@example.com', 'phone': '+15550001'},
+            {'name': 'Existing', 'email': 'existing@example.com'},
+            {'name': 'Again', 'email': 'new@example.com'},
+            {'name': 'Bad', 'email': 'bad@example.com', 'phone': 'abc'},
+        ]})['bulkCreateCustomers']
+        self.assertEqual(data['customers'], [{'name': 'New', 'email': 'new@example.com'}])
+        self.assertEqual(len(data['errors']), 3)
+        self.assertEqual(Customer.objects.count(), 2)
+
+    def test_bulk_create_reports_concurrent_insert(self):
+        with mock.patch.object(Customer.objects, 'bulk_create', side_effect=IntegrityError):
+            error = self.execute_error(self.mutation, {'input': [{'name': 'New', 'email': 'new@example.com'}]})
+        self.assertIn('Please retry', error)
+
+
+class CreateCustomerTests(GraphQLTestCase):
+    mutation = 'mutation($input: CreateCustomerInput!) { createCustomer(input: $input) { customer { name } } }'
+
+    def test_create_customer_email_clash_takes_priority(self):
+        Customer.objects.create(name='A', email='a@example.com', phone='+15550001')
+        Customer.objects.create(name='B', email='b@example.com')
+
+        error = self.execute_error(self.mutation, {'input': {'name': 'X', 'email': 'b@example.com', 'phone': '+15550001'}})
+        self.assertIn('email already exists', error)
+        error = self.execute_error(self.mutation, {'input': {'name': 'X', 'email': 'x@example.com', 'phone': '+15550001'}})
+        self.assertIn('phone number already exists', error)
+
+        # one uniqueness check + the insert
+        with self.assertNumQueries(2):
+            self.execute(self.mutation, {'input': {'name': 'X', 'email': 'x@example.com', 'phone': '+15550002'}})
+
+
+class SeedBulkInsertTests(TestCase):
+    def test_uses_copy_loader_on_postgresql(self):
+        products = [Product(name='Widget', price=1)]
+        with mock.patch.object(seed_db, 'bulk_insert_models') as copy, \
+                mock.patch.object(seed_db, 'connection', mock.Mock(vendor='postgresql')):
+            seed_db.bulk_insert(Product, products, batch_size=10)
+        copy.assert_called_once_with(products, ignore_conflicts=False)
+        self.assertFalse(Product.objects.exists())
+
+    def test_falls_back_to_bulk_create_without_django_bulk_load(self):
+        with mock.patch.object(seed_db, 'bulk_insert_models', None):
+            seed_db.bulk_insert(Product, [Product(name='Widget', price=1)], batch_size=10)
+        self.assertEqual(Product.objects.count(), 1)
+
+
+class NodeQueryTests(GraphQLTestCase):
+    def test_distinct_node_ids_load_in_one_query_per_type(self):
+        customers = [Customer.objects.create(name=f'Customer {i}', email=f'c{i}@example.com') for i in range(3)]
+        products = [Product.objects.create(name=f'Product {i}', price=1) for i in range(2)]
+        query = '''query($id: ID!) {
+            a: node(id: "%s") { ... on CustomerType { name } }
+            b: node(id: "%s") { ... on CustomerType { name } }
+            c: node(id: $id) { ... on CustomerType { name } }
+            d: node(id: "%s") { ... on ProductType { name } }
+            e: node(id: "%s") { ... on ProductType { name } }
+        }''' % (
+            to_global_id('CustomerType', customers[0].pk),
+            to_global_id('CustomerType', customers[1].pk),
+            to_global_id('ProductType', products[0].pk),
+            to_global_id('ProductType', products[1].pk),
+        )
+        with self.assertNumQueries(2):
+            data = self.execute(query, {'id': to_global_id('CustomerType', customers[2].pk)})
+        self.assertEqual(
+            [data[key]['name'] for key in 'abcde'],
+            ['Customer 0', 'Customer 1', 'Customer 2', 'Product 0', 'Product 1'],
+        )
+
+
+class ListCacheTests(GraphQLTestCase):
+    query = '{ allProducts(name: "Widget") { edges { node { name stock } } } }'
+
+    def test_cache_hit_then_bust_on_create_product(self):
+        Product.objects.create(name='Widget A', price=5, stock=3)
+
+        with self.assertNumQueries(1):
+            self.execute(self.query)
+        with self.assertNumQueries(0):
+            data = self.execute(self.query)
+        self.assertEqual(len(data['allProducts']['edges']), 1)
+
+        self.execute('mutation { createProduct(input: {name: "Widget B", price: 2.5, stock: 4}) { message } }')
+
+        with self.assertNumQueries(1):
+            data = self.execute(self.query)
+        self.assertEqual(
+            [edge['node']['name'] for edge in data['allProducts']['edges']],
+            ['Widget A', 'Widget B'],
+        )
+
+    def test_pages_of_a_cached_filter_share_one_entry(self):
+        for i in range(4):
+            Product.objects.create(name=f'Widget {i}', price=1)
+        self.execute('{ allProducts(name: "Widget", first: 2) { edges { node { name } } } }')
+        with self.assertNumQueries(0):
+            data = self.execute('{ allProducts(name: "Widget", first: 2, offset: 2) { edges { node { name } } } }')
+        self.assertEqual([edge['node']['name'] for edge in data['allProducts']['edges']], ['Widget 2', 'Widget 3'])
+
+    def test_bulk_customer_writes_bust_the_customer_list(self):
+        query = '{ allCustomers { edges { node { name } } } }'
+        self.execute(query)
+        self.execute('''mutation { bulkCreateCustomers(input: [{name: "Ann", email: "ann@example.com"}]) { errors } }''')
+        data = self.execute(query)
+        self.assertEqual([edge['node']['name'] for edge in data['allCustomers']['edges']], ['Ann'])
+
+
+class OrderProductsConnectionTests(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        customer = Customer.objects.create(name='Buyer', email='buyer@example.com')
+        products = [Product.objects.create(name=f'Product {i}', price=1) for i in range(4)]
+        for i in range(10):
+            order = Order.objects.create(customer=customer, total_amount=1)
+            order.product.set(products[i % 2:i % 2 + 2])
+
+    def test_nested_order_products_are_prefetched(self):
+        # count + customers + prefetched orders + prefetched products
+        with self.assertNumQueries(4):
+            data = self.execute('''{
+                allCustomers { edges { node { orderSet { edges { node {
+                    products { edges { node { name } } }
+                } } } } } }
+            }''')
+        orders = data['allCustomers']['edges'][0]['node']['orderSet']['edges']
+        self.assertEqual(len(orders), 10)
+        self.assertEqual(
+            [edge['node']['name'] for edge in orders[1]['node']['products']['edges']],
+            ['Product 1', 'Product 2'],
+        )
+
+    def test_order_products_can_be_paginated(self):
+        order = Order.objects.first()
+        data = self.execute('''query($id: ID!) {
+            node(id: $id) { ... on OrderType { products(first: 1) { edges { node { name } } pageInfo { hasNextPage } } } }
+        }''', {'id': to_global_id('OrderType', order.pk)})
+        products = data['node']['products']
+        self.assertEqual(len(products['edges']), 1)
+        self.assertTrue(products['pageInfo']['hasNextPage'])
+
+
+class FilterIndexTests(TestCase):
+    def indexes(self, model):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        return {name: info['columns'] for name, info in constraints.items() if info['index']}
+
+    def test_filter_columns_are_indexed(self):
+        self.assertLessEqual(
+            {'crm_customer_created_idx', 'crm_customer_phone_null_idx'}, self.indexes(Customer).keys()
+        )
+        self.assertLessEqual({'crm_product_price_idx', 'crm_product_stock_idx'}, self.indexes(Product).keys())
+        self.assertLessEqual({'crm_order_date_idx', 'crm_order_total_idx'}, self.indexes(Order).keys())
+
+    def test_phone_prefix_lookups_have_an_index(self):
+        self.assertIn(['phone'], self.indexes(Customer).values())
+
+
+class CustomerPhoneFilterTests(GraphQLTestCase):
+    def test_phone_startswith_matches_prefix_or_missing_phone(self):
+        Customer.objects.create(name='Alice', email='alice@example.com', phone='+33123')
+        Customer.objects.create(name='Bob', email='bob@example.com', phone='+44123')
+        Customer.objects.create(name='Carol', email='carol@example.com')
+        Customer.objects.create(name='Dave', email='dave@example.com', phone='+33999')
+
+        data = self.execute('{ allCustomers(phoneStartswith: "+33") { edges { node { name } } } }')
+        names = sorted(edge['node']['name'] for edge in data['allCustomers']['edges'])
+        self.assertEqual(names, ['Alice', 'Carol', 'Dave'])
+
+        # The filter result can still be narrowed by other filters
+        data = self.execute('{ allCustomers(phoneStartswith: "+33", name: "a") { edges { node { name } } } }')
+        names = sorted(edge['node']['name'] for edge in data['allCustomers']['edges'])
+        self.assertEqual(names, ['Alice', 'Carol', 'Dave'])
+        data = self.execute('{ allCustomers(phoneStartswith: "+33", name: "ali") { edges { node { name } } } }')
+        self.assertEqual([edge['node']['name'] for edge in data['allCustomers']['edges']], ['Alice'])
+
+
+class CreateOrderTests(GraphQLTestCase):
+    mutation = '''mutation($customer: ID!, $products: [ID]!) {
+        createOrder(input: {customerId: $customer, productIds: $products}) {
+            order { totalAmount products { edges { node { name } } } }
+        }
+    }'''
+
+    def setUp(self):
+        super().setUp()
+        self.customer = Customer.objects.create(name='Buyer', email='buyer@example.com')
+        self.products = [Product.objects.create(name=f'Product {i}', price=i + 1) for i in range(3)]
+
+    def test_create_order_totals_distinct_products(self):
+        ids = [self.products[0].pk, self.products[2].pk, self.products[0].pk]
+        data = self.execute(self.mutation, {'customer': self.customer.pk, 'products': ids})['createOrder']['order']
+        self.assertEqual(data['totalAmount'], 4.0)
+        self.assertEqual(len(data['products']['edges']), 2)
+
+    def test_create_order_rejects_unknown_products(self):
+        error = self.execute_error(self.mutation, {'customer': self.customer.pk, 'products': [self.products[0].pk, 999]})
+        self.assertIn('invalid or do not exist', error)
+        self.assertFalse(Order.objects.exists())
+
+    def test_create_order_caps_distinct_products(self):
+        ids = list(range(1, MAX_ORDER_PRODUCTS + 2))
+        error = self.execute_error(self.mutation, {'customer': self.customer.pk, 'products': ids})
+        self.assertIn(str(MAX_ORDER_PRODUCTS), error)
+
+
+class SeedClearDataTests(TestCase):
+    def test_clear_data_empties_every_table(self):
+        customer = Customer.objects.create(name='Buyer', email='buyer@example.com')
+        order = Order.objects.create(customer=customer, total_amount=1)
+        order.product.add(Product.objects.create(name='Widget', price=1))
+
+        seed_db.clear_data()
+
+        for model in (Customer, Product, Order, Order.product.through):
+            self.assertFalse(model.objects.exists())
+
+    def test_clear_data_truncates_on_postgresql(self):
+        postgres = mock.MagicMock(vendor='postgresql')
+        postgres.ops.quote_name = connection.ops.quote_name
+        keys = [list_cache_key(Customer, {}), list_cache_key(Product, {})]
+
+        with mock.patch.object(seed_db, 'connection', postgres):
+            seed_db.clear_data()
+
+        cursor = postgres.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with(
+            'TRUNCATE "crm_order_product", "crm_order", "crm_customer", "crm_product" RESTART IDENTITY CASCADE'
+        )
+        # TRUNCATE sends no signals, so the cached lists are dropped explicitly
+        self.assertNotEqual(keys, [list_cache_key(Customer, {}), list_cache_key(Product, {})])
+
+
+class FilterSetFormTests(GraphQLTestCase):
+    def test_form_class_is_built_once_per_filterset(self):
+        first = ProductFilter(data={'price__gte': 'abc'})
+        second = ProductFilter(data={'price__gte': '5'})
+        self.assertIs(type(first.form), type(second.form))
+        # Form instances stay independent
+        self.assertFalse(first.is_valid())
+        self.assertTrue(second.is_valid())
+
+    def test_subclass_builds_its_own_form_class(self):
+        class ExpensiveProductFilter(ProductFilter):
+            in_stock = django_filters.BooleanFilter(field_name='stock', lookup_expr='gt')
+
+        ProductFilter().get_form_class()
+        form_class = ExpensiveProductFilter().get_form_class()
+        self.assertIsNot(form_class, ProductFilter().get_form_class())
+        self.assertIn('in_stock', form_class.base_fields)
+
+    def test_filtering_is_unchanged_across_requests(self):
+        Product.objects.create(name='Cheap', price=1, stock=1)
+        Product.objects.create(name='Dear', price=50, stock=1)
+        for bound, expected in (('price_Gte: 10', ['Dear']), ('price_Lte: 10', ['Cheap']), ('price_Gte: 10', ['Dear'])):
+            data = self.execute('{ allProducts(%s) { edges { node { name } } } }' % bound)
+            self.assertEqual([edge['node']['name'] for edge in data['allProducts']['edges']], expected)
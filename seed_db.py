@@ -4,19 +4,48 @@ import random
 from decimal import Decimal
 from datetime import datetime
 from faker import Faker
+from django.db import connection, transaction
 
 # Set up Django environment
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql_crm.settings')
 django.setup()
 
 from crm.models import Customer, Product, Order
+from crm.caching import bump_cache_generation
+from crm.constants import BULK_BATCH_SIZE
+
+try:
+    from django_bulk_load import bulk_insert_models  # Optional: PostgreSQL COPY loader
+except ImportError:
+    bulk_insert_models = None
 
 # Initialize Faker
 faker = Faker()
 
+THROUGH_BATCH_SIZE = 5000  # Order/product link rows are two integers, so larger batches are fine
+
+def bulk_insert(model, objs, batch_size=None, ignore_conflicts=False):
+    """Insert objs with PostgreSQL COPY when django-bulk-load is installed, else bulk_create."""
+    if bulk_insert_models is not None and connection.vendor == 'postgresql':
+        bulk_insert_models(objs, ignore_conflicts=ignore_conflicts)
+    else:
+        model.objects.bulk_create(objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts)
+
 # clear existing data
 def clear_data():
     """Clear existing data from the database."""
+    if connection.vendor == 'postgresql':
+        # One TRUNCATE empties every table at once and resets the ID sequences
+        tables = [model._meta.db_table for model in (Order.product.through, Order, Customer, Product)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"TRUNCATE {', '.join(map(connection.ops.quote_name, tables))} RESTART IDENTITY CASCADE"
+            )
+        # TRUNCATE sends no delete signals, so drop the cached lists here
+        bump_cache_generation(Customer)
+        bump_cache_generation(Product)
+        return
+
     Customer.objects.all().delete()
     Product.objects.all().delete()
     Order.objects.all().delete()
@@ -42,7 +71,8 @@ def create_random_customers(n=10):
             email=faker.email(),
             phone=faker.phone_number()
         ))
-    Customer.objects.bulk_create(customers)
+    with transaction.atomic():
+        bulk_insert(Customer, customers, batch_size=BULK_BATCH_SIZE)
     print(f"Created {Customer.objects.count()} customers.")
 
 # Function to create random products
@@ -55,7 +85,8 @@ def create_random_products(n=20):
             price=round(Decimal(random.uniform(10.0, 1000.0)), 2),
             stock=random.randint(0, 100)
         ))
-    Product.objects.bulk_create(products)
+    with transaction.atomic():
+        bulk_insert(Product, products, batch_size=BULK_BATCH_SIZE)
     print(f"Created {Product.objects.count()} products.")
 
 # Function to create random orders
@@ -68,15 +99,27 @@ def create_random_orders(n=5):
         print("No customers or products available to create orders.")
         return
 
+    # Build all orders in memory, then insert orders and their product links in one batch each
+    pairs = []
     for _ in range(n):
-        customer = random.choice(customers)
         order_products = random.sample(products, k=random.randint(1, min(5, len(products))))
         total_amount = sum(product.price for product in order_products)
-
-        order = Order.objects.create(
-            customer=customer,
+        order = Order(
+            customer=random.choice(customers),
             total_amount=round(Decimal(total_amount), 2),
             order_date=faker.date_time_this_year()
         )
-        order.product.set(order_products)
-        print(f"Created order {order.id} for customer {customer.name} with total amount {order.total_amount}.")
\ No newline at end of file
+        pairs.append((order, order_products))
+
+    Through = Order.product.through
+    with transaction.atomic():
+        Order.objects.bulk_create([order for order, _ in pairs], batch_size=BULK_BATCH_SIZE)
+        bulk_insert(
+            Through,
+            [Through(order_id=order.id, product_id=product.id) for order, plist in pairs for product in plist],
+            batch_size=THROUGH_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+
+    for order, _ in pairs:
+        print(f"Created order {order.id} for customer {order.customer.name} with total amount {order.total_amount}.")